@@ -31,19 +31,22 @@ import humanfriendly
 from lopper.log import _init, _warning, _info, _error, _debug
 import logging
 
+# patterns are compiled once at import, rather than on every call
+_ISOSPEC_V1_RE = re.compile( "isospec,isospec-v1" )
+_MODULE_ISOSPEC_RE = re.compile( "module,isospec" )
+_CPU_NUM_RE = re.compile( r'.*?(\d+)' )
+_CPU_NODE_NUM_RE = re.compile( r'cpu@(\d+)' )
+
 def is_compat( node, compat_string_to_test ):
-    if re.search( "isospec,isospec-v1", compat_string_to_test):
+    if _ISOSPEC_V1_RE.search( compat_string_to_test ):
         return isospec_domain
-    if re.search( "module,isospec", compat_string_to_test):
+    if _MODULE_ISOSPEC_RE.search( compat_string_to_test ):
         return isospec_domain
     return ""
 
 # tests for a bit that is set, going fro 31 -> 0 from MSB to LSB
 def check_bit_set(n, k):
-    if n & (1 << (k)):
-        return True
-
-    return False
+    return bool(n & (1 << k))
 
 def set_bit(value, bit):
     return value | (1<<bit)
@@ -71,9 +74,22 @@ class domain_yaml(object):
                                         }
                               }
 
+    # the map is compiled once, at import, into a single alternation with
+    # a named group per entry. A cpu name is then matched with one search
+    # and the matching group gives us the map entry.
+    iso_cpus_re = re.compile( "|".join( f"(?P<cpu{i}>{pat})" for i,pat in enumerate(iso_cpus_to_device_tree_map) ) )
+    iso_cpus_group_map = { f"cpu{i}": dn for i,dn in enumerate(iso_cpus_to_device_tree_map.values()) }
+
     def __init__( self, sdt = None ):
         self.tree = LopperTree()
         self.sdt = sdt
+        # subsystem/domain nodes, indexed by name as they are added,
+        # so conversion doesn't need to search the tree for them
+        self.node_index = {}
+        # compatible string -> (matching sdt nodes, { cpu number: node })
+        self.compat_cache = {}
+        # hex(address) -> [ sdt nodes ], built on first use
+        self.addr_index = None
 
 
     def subsystem_add( self, subsystem_name="default-subsystem", subsystem_id=0 ):
@@ -82,6 +98,7 @@ class domain_yaml(object):
         subsystems_node["id"] = subsystem_id
 
         self.tree = self.tree + subsystems_node
+        self.node_index.setdefault( subsystem_name, subsystems_node )
 
         return subsystems_node
 
@@ -105,50 +122,102 @@ class domain_yaml(object):
             _debug( f"               adding domain '{domain_name}' parent: {parent_domain}" )
             parent_domain + domain_node
 
+        self.node_index.setdefault( domain_name, domain_node )
+
         return domain_node
 
+    def node_lookup( self, name ):
+        """ returns the subsystem or domain node for a name, falling
+            back to a tree search if it wasn't added via this object
+        """
+        try:
+            return self.node_index[name]
+        except KeyError:
+            node = self.tree.nodes( name )[0]
+            self.node_index[name] = node
+            return node
+
     def cpu_map( self, cpu_name ):
-        cpu_map = {}
-        for n,dn in domain_yaml.iso_cpus_to_device_tree_map.items():
-            if re.search( n, cpu_name ):
-                cpu_map = dn
+        m = domain_yaml.iso_cpus_re.search( cpu_name )
+        if m:
+            return domain_yaml.iso_cpus_group_map[m.lastgroup]
+
+        return {}
+
+    def compat_cpus( self, compat ):
+        """ returns the sdt nodes compatible with a string, and a
+            dictionary of those nodes indexed by their cpu@<n> number.
+            Many cpus share a compatible string, so this is cached.
+        """
+        try:
+            return self.compat_cache[compat]
+        except KeyError:
+            pass
+
+        nodes = self.sdt.tree.cnodes( compat )
+        cpu_nums = {}
+        for node in nodes:
+            m = _CPU_NODE_NUM_RE.search( node.name )
+            if m:
+                cpu_nums[m.group(1)] = node
+
+        self.compat_cache[compat] = ( nodes, cpu_nums )
 
-        return cpu_map
+        return self.compat_cache[compat]
+
+    def addr_nodes( self, address ):
+        """ returns the sdt nodes at a translated address (a hex string),
+            or None.
+
+            This matches sdt.tree.addr_node(), but the addresses of the
+            tree are calculated once and indexed, rather than on every
+            lookup. The sdt is not modified while the domains are being
+            generated, so the index stays valid.
+        """
+        if self.addr_index is None:
+            self.addr_index = {}
+            for n in self.sdt.tree.__nodes__.values():
+                if "@" in n.name:
+                    node_address = n.address()
+                    if node_address:
+                        self.addr_index.setdefault( hex(node_address), [] ).append( n )
+
+        # the index covers the same nodes as addr_node(), so a miss
+        # means there is no node at the address
+        return self.addr_index.get( address )
 
     def device_flags_map( self, device_name, access ):
         domain_flag_dict = {}
 
         if type(access) == dict:
             # _info( f"device_flags_map: {access}" )
-            try:
-                flags = access["flags"]
-                for flag,value in flags.items():
-                    if value:
-                        domain_flag_dict[flag] = True
-            except:
-                return domain_flag_dict
+            flags = access.get( "flags", {} )
+            for flag,value in flags.items():
+                if value:
+                    domain_flag_dict[flag] = True
         else:
             # try 1: is it a property ?
             flags = access.propval( "flags" )
 
             # try 2: is it a subnode ?
             if not flags[0]:
-                for n in access.children():
-                    if n.name == "flags":
-                        for p in n:
-                            flags.append( p )
+                flags_node = next( (n for n in access.children() if n.name == "flags"), None )
+                if flags_node:
+                    for p in flags_node:
+                        flags.append( p )
 
             # map the flags to something domains.yaml can output
             # create a flags dictionary, so we can next it into the access
             # structure below, which will then be transformed into yaml later.
             for flag in flags:
-                try:
-                    if flag.value != '':
-                        # if a flag is present, it means it was set to "true", it
-                        # won't even be here in the false case.
-                        domain_flag_dict[flag.name] = True
-                except:
-                    pass
+                # the [""] placeholder from propval() has no value, a
+                # boolean "true" property has a value of [], so this is
+                # not a truthiness test.
+                val = getattr( flag, "value", None )
+                if val is not None and val != '':
+                    # if a flag is present, it means it was set to "true", it
+                    # won't even be here in the false case.
+                    domain_flag_dict[flag.name] = True
 
         # _info( "isospec_device_flags: %s %s" % (device_name,domain_flag_dict) )
 
@@ -181,7 +250,7 @@ class domain_yaml(object):
         if device_tree_compat:
             # is there a number in the isospec name ? If so, that is our
             # mask, if not, we set the cpu mask to 0x3 (them all)
-            m = re.match( r'.*?(\d+)', cpu_name )
+            m = _CPU_NUM_RE.match( cpu_name )
             if m:
                 cpu_number = m.group(1)
             else:
@@ -189,7 +258,7 @@ class domain_yaml(object):
 
             # look in the device tree for a node that matches the
             # mapped compatible string
-            compatible_nodes = self.sdt.tree.cnodes( device_tree_compat )
+            compatible_nodes, cpu_nodes = self.compat_cpus( device_tree_compat )
             if compatible_nodes:
                 # we need to find the cluster name / label, that's the parent
                 # of the matching nodes, any node will do, so we take the first
@@ -206,68 +275,53 @@ class domain_yaml(object):
                 # and set the bit. If there's no number, our mask is
                 # 0xf
                 cluster_mask = 0
+                cluster_cpu_label = ''
                 if cpu_number != -1:
-                    for c in compatible_nodes:
-                        if re.search( "cpu@" + cpu_number, c.name ):
-                            cluster_mask = set_bit( cluster_mask, int(cpu_number) )
-                            cluster_cpu_label = c.label
+                    if cpu_number in cpu_nodes:
+                        cluster_mask |= 1 << int(cpu_number)
+                        cluster_cpu_label = cpu_nodes[cpu_number].label
                 else:
-                    cluster_cpu_label = ''
                     cluster_mask = 0xf
 
                 # cpu mode checks.
                 #    secure
                 #    el
-                try:
-                    cpu_flags = cpus_info["flags"]
-                except:
-                    cpu_flags = {}
-
+                #
+                # no cpu flags are passed to cpu_add(), so the cpu is not
+                # secure and the el level comes from the cpu_map
                 secure = False
                 mode_mask = 0
-                try:
-                    secure_val = cpu_flags["secure"]
-                    secure = secure_val
-                except Exception as e:
-                    pass
-
-                try:
-                    mode = cpu_flags["mode"]
-                    if mode == "el":
-                        mode_mask = set_bit( mode_mask, 0 )
-                        mode_mask = set_bit( mode_mask, 1 )
-                except:
-                    # no passed mode, use the el level from the cpu_map
-                    if cpu_map:
-                        mode_mask = cpu_map["el"]
-
+                if cpu_map:
+                    mode_mask = cpu_map["el"]
+
+                # the entry stays a python structure, it is serialized
+                # once, when the tree is written.
+                cpu_entry = { "dev": cluster_name,    # remove before writing to yaml (if no roundtrip)
+                              "spec_name": cpu_name,  # remove before writing to yaml (if no roundtrip)
+                              "cluster" : cluster_name,
+                              "cluster_cpu" : cluster_cpu_label,
+                              "cpumask" : hex(cluster_mask),
+                              "mode" : { "secure": secure }
+                             }
                 if mode_mask:
-                    cpu_entry = { "dev": cluster_name,    # remove before writing to yaml (if no roundtrip)
-                                  "spec_name": cpu_name,  # remove before writing to yaml (if no roundtrip)
-                                  "cluster" : cluster_name,
-                                  "cluster_cpu" : cluster_cpu_label,
-                                  "cpumask" : hex(cluster_mask),
-                                  "mode" : { "secure": secure,
-                                             "el": hex(mode_mask)
-                                            }
-                                 }
-                else:
-                    cpu_entry = { "dev": cluster_name,    # remove before writing to yaml (if no roundtrip)
-                                  "spec_name": cpu_name,  # remove before writing to yaml (if no roundtrip)
-                                  "cluster" : cluster_name,
-                                  "cluster_cpu" : cluster_cpu_label,
-                                  "cpumask" : hex(cluster_mask),
-                                  "mode" : { "secure": secure }
-                                 }
+                    cpu_entry["mode"]["el"] = hex(mode_mask)
 
                 cpu_list.value.append( cpu_entry )
         else:
-            _warning( f"cpus entry {cpus_info[c]} has no device tree mapping" )
+            _warning( f"cpus entry {cpu} has no device tree mapping" )
 
     def memory_add( self, domain_or_subsystem, memory ):
         _info( f"memory_add: {domain_or_subsystem}: {memory}" )
 
         debug = False
+
+        # one pass over the memory map, the result is reused below
+        mem_entry = isospec.memory_entry( memory["name"] )
+        if mem_entry:
+            mapped_type, mapped_dest = mem_entry
+        else:
+            mapped_type, mapped_dest = "memory", ""
+
         try:
             # is it explicitly tagged as memory ?
             mem_dest_flag = memory["mem"]
@@ -277,15 +331,15 @@ class domain_yaml(object):
             # tag it via the regex.
             try:
                 nodeid = memory["nodeid"]
-                memory_dest = isospec.memory_dest( memory["name"] )
-                memory_type = isospec.memory_type( memory["name"] )
+                memory_dest = mapped_dest
+                memory_type = mapped_type
             except:
                 memory_type = "memory"
         except:
             # if it isn't, we have a regex match to figure
             # out what type of memory it may be
-            memory_dest = isospec.memory_dest( memory["name"] )
-            memory_type = isospec.memory_type( memory["name"] )
+            memory_dest = mapped_dest
+            memory_type = mapped_type
 
         # if memory_type == "sram":
         #     _info( "debug: sram found" )
@@ -332,8 +386,8 @@ class domain_yaml(object):
         # if there's no possible device nodes, then we double
         # check the type mapping
         if not possible_mem_nodes:
-            memory_dest = isospec.memory_dest( memory["name"] )
-            memory_type = isospec.memory_type( memory["name"] )
+            memory_dest = mapped_dest
+            memory_type = mapped_type
 
 
         ## Note: when we start to consider the found memory nodes
@@ -372,7 +426,7 @@ class domain_yaml(object):
 
         try:
             address = device['addr']
-            tnodes = self.sdt.tree.addr_node( address )
+            tnodes = self.addr_nodes( address )
             if not tnodes:
                 raise Exception( f"No node found for: {device}" )
 
@@ -407,13 +461,14 @@ class isospec(object):
     # If something appears in this map, it is a memory entry, and
     # we need to process it as such.
     #
-    # This is a static variable!
+    # This is a static variable! The patterns are compiled once, at
+    # import time.
     #
-    iso_memory_device_map = {
-            "DDR0" : ["memory", "memory@.*"],
-            "OCM.*" : ["sram", None],
-            ".*TCM.*" : ["sram", None]
-    }
+    iso_memory_device_map = [
+            ( re.compile( "DDR0" ), ["memory", "memory@.*"] ),
+            ( re.compile( "OCM.*" ), ["sram", None] ),
+            ( re.compile( ".*TCM.*" ), ["sram", None] )
+    ]
 
     def __init__( self, json_file = None ):
         self.json = None
@@ -433,12 +488,19 @@ class isospec(object):
 
 
     @classmethod
-    def memory_type( cls, name ):
-        mem_found = None
-        for n,v in isospec.iso_memory_device_map.items():
-            if re.search( n, name ):
-                mem_found = v
+    def memory_entry( cls, name ):
+        """ returns the (type, dest) memory mapping for a name, or
+            None if it isn't in the memory map. The first match wins.
+        """
+        for pat,v in isospec.iso_memory_device_map:
+            if pat.search( name ):
+                return ( v[0], v[1] )
 
+        return None
+
+    @classmethod
+    def memory_type( cls, name ):
+        mem_found = cls.memory_entry( name )
         if mem_found:
             return mem_found[0]
 
@@ -446,11 +508,7 @@ class isospec(object):
 
     @classmethod
     def memory_dest( cls, name ):
-        mem_found = None
-        for n,v in isospec.iso_memory_device_map.items():
-            if re.search( n, name ):
-                mem_found = v
-
+        mem_found = cls.memory_entry( name )
         if mem_found:
             return mem_found[1]
 
@@ -534,28 +592,20 @@ class isospec(object):
         try:
             default_access = subsystem_node["access"]
             #access_list = []
-            for d in range(len(default_access)):
-                element =  default_access[d]
-                # access_list.append( default_access[d] )
+            # a list without dictionaries (i.e. "access": []) is stored as
+            # a plain property, and has no entries to walk.
+            if default_access.pclass != "json":
+                default_access = []
+
+            # iterate, rather than index, the json property so the value
+            # is decoded once and not once per element
+            for element in default_access:
+                # access_list.append( element )
                 try:
                     dname = element["name"]
-                    try:
-                        dtype = element["type"]
-                    except:
-                        dtype = "device"
-
-                    try:
-                        destinations = element["destinations"]
-                    except:
-                        try:
-                            destinations = element["SMIDs"]
-                        except:
-                            destinations = []
-
-                    try:
-                        flags = element["flags"]
-                    except:
-                        flags = {}
+                    dtype = element.get( "type", "device" )
+                    destinations = self.dests( element )
+                    flags = element.get( "flags", {} )
 
                     _info( f"[{name}/access] device found:" )
                     _info( f"    name: {dname}" )
@@ -591,37 +641,43 @@ class isospec(object):
             design_cells = isospec_json_tree["/design/cells"]
         except:
             _warning( "no design/cells found in isolation spec" )
-            return device_dict
+            return device_dict, smid_dict
 
         cell_list = [ design ]
         cell_list.extend( design_cells.children() )
         #cell_list = [ design_cells.children() ]
         for cell in cell_list:
         #for cell in design_cells.children():
-            try:
+            _debug( f"processing cell: {cell.name}" )
+
+            # propval() returns [""] for a missing property, which avoids
+            # raising (and catching) a KeyError for every cell that has no
+            # destinations or SMIDs. Only a json property holds entries, a
+            # list with no dictionaries (i.e. "destinations": []) is stored
+            # as a plain property, and there's nothing to collect from it.
+            if cell.propval( "destinations" ) != [""] and cell["destinations"].pclass == "json":
                 dests = cell["destinations"]
-                _debug( f"processing cell: {cell.name}" )
                 _debug( f"           destinations {dests.abs_path} [{len(dests)}]" )
-                for d in range(len(dests)):
-                    dest = dests[d]
+                # iterating the property decodes the json value once, indexing
+                # it decodes the entire value on every access.
+                for dest in dests:
                     _debug( f"                dest: {dest}" )
+                    if type(dest) != dict:
+                        _debug( f"                   ** destination '{dest}' is not a device, skipping" )
+                        continue
+
                     # A device has to have a nodeid for us to consider it, since
                     # otherwise it can't be referenced. The exception to this is
                     # memory, since memory entries never have nodeids.
-                    try:
-                        nodeid = dest["nodeid"]
+                    if "nodeid" in dest:
                         device_dict[dest["name"]] = {
                                                       "refcount": 0,
                                                       "dest": dest
                                                     }
-                    except:
-                        try:
-                            is_it_mem = dest["mem"]
-                            # _info( f"we found memory: {dest}" )
-                        except:
-                            ## We could do the second regex match on other devices
-                            ## to see if they are memory. i.e. DDRxy ..
-                            is_it_mem = False
+                    else:
+                        ## We could do the second regex match on other devices
+                        ## to see if they are memory. i.e. DDRxy ..
+                        is_it_mem = dest.get( "mem", False )
 
                         # this may be controlled by a command line option
                         # in the future
@@ -643,23 +699,19 @@ class isospec(object):
                             _debug( f"                   ** destination '{dest}' device has no nodeid, skipping" )
                             # os._exit(1)
 
+            if cell.propval( "SMIDs" ) != [""] and cell["SMIDs"].pclass == "json":
                 dests = cell["SMIDs"]
                 _debug( f"           SMIDs {dests.abs_path} [{len(dests)}]" )
-                for d in range(len(dests)):
-                    dest = dests[d]
+                for dest in dests:
                     _debug( f"                dest: {dest}" )
-                    try:
-                        name = dest["name"]
-                        smid_dict[name] = {
+                    if type(dest) == dict and "name" in dest:
+                        smid_dict[dest["name"]] = {
                             "refcount": 0,
                             # Could be renmaed to "dests" to match the subsystem tracker type
                             "dest": dest
                             }
-                    except:
-                        _debug( f"                    skipping dest {dest} ({e})" )
-
-            except:
-                    continue
+                    else:
+                        _debug( f"                    skipping dest {dest} (no name)" )
 
 
         return device_dict, smid_dict
@@ -671,10 +723,17 @@ class isospec(object):
         # we look up further, otherwise return what was
         # passed in. This allows the caller to abstract
         # where there access definition comes from
+        if type(access_entry) != dict:
+            return access_entry
+
+        name = access_entry.get( "same_as_default" )
+        if name is None:
+            return access_entry
+
         try:
-            name = access_entry["same_as_default"]
             access = self.default_settings[name]["json"]
-        except:
+        except KeyError:
+            _warning( f"access '{name}' has no default settings, using the access entry" )
             access = access_entry
 
         return access
@@ -692,28 +751,13 @@ class isospec(object):
 
     ## just returns the names, not the device
     def dests( self, access ):
-        destlist = []
-        try:
-            try:
-                destinations = access["destinations"]
-                destlist.extend( destinations )
-                # for now, we only allow one type of destination
-                return destlist
-            except:
-                pass
+        # for now, we only allow one type of destination. Each key
+        # is looked up once, and a missing key doesn't raise.
+        destinations = access.get( "destinations" )
+        if destinations is None:
+            destinations = access.get( "SMIDs", [] )
 
-            try:
-                #_info( f"checking smids: {access}" )
-                destinations = access["SMIDs"]
-                destlist.extend( destinations )
-                # for now, we only allow one type of destination
-                return destlist
-            except:
-                pass
-        except:
-            pass
-
-        return destlist
+        return list( destinations )
 
     # find a device by access, optionally getting the
     # flags as well
@@ -741,33 +785,17 @@ class isospec(object):
         return destlist
 
     ## find a device by name
+    ## device_dict is the name index built once by device_collect(), so
+    ## each lookup is a dictionary hit. Unknown names are skipped.
     def devices( self, device_name_list ):
-        devlist = []
-        try:
-            if self.device_dict:
-                for d in device_name_list:
-                    device = self.device_dict[d]
-                    devlist.append( device['dest'] )
-        except:
-            pass
-
-        return devlist
+        return [ self.device_dict[d]['dest'] for d in device_name_list if d in self.device_dict ]
 
     ## find a cpu by name
     ## TODO: we could just make devices() try this if it
     ##       fails in device lookup. That way we don't push
     ##       the type detection onto the caller
     def cpus( self, cpu_name_list ):
-        cpulist = []
-        try:
-            if self.smid_dict:
-                for c in cpu_name_list:
-                    cpu = self.smid_dict[c]
-                    cpulist.append( cpu['dest'] )
-        except:
-            pass
-
-        return cpulist
+        return [ self.smid_dict[c]['dest'] for c in cpu_name_list if c in self.smid_dict ]
 
     def is_subsystem( self, name ):
         sub = self.subsystem( name )
@@ -786,10 +814,8 @@ class isospec(object):
         try:
             nodes = self.json_tree["/design/subsystems"]
             if name:
-                for n in nodes.children():
-                    if n.name == name:
-                        return [ n ]
-                return []
+                sub = next( (n for n in nodes.children() if n.name == name), None )
+                return [ sub ] if sub else []
             else:
                 return nodes.children()
         except:
@@ -824,12 +850,8 @@ class isospec(object):
                 for d in domains:
                     return d.children()
             else:
-                for d in domains:
-                    for dd in d.children():
-                        if dd.name == domain_name:
-                            return [dd]
-
-                return []
+                dd = next( (dd for d in domains for dd in d.children() if dd.name == domain_name), None )
+                return [ dd ] if dd else []
         except:
             return []
 
@@ -879,7 +901,7 @@ class isospec(object):
         ## TODO: we should add the subsystem name, since there's
         ##       no guarantee at all that the domain names are unique
 
-        yaml_node = domains_tree.tree.nodes( spec_node.name )[0]
+        yaml_node = domains_tree.node_lookup( spec_node.name )
 
         containing_subsystem = self.subsystem_container( spec_node )
 
@@ -898,109 +920,108 @@ class isospec(object):
             except Exception as e:
                 pass
 
-            try:
+            # propval() returns [""] when there is no access, which
+            # avoids wrapping the entire conversion in a try/except that
+            # also hid any real errors. Only a json property holds access
+            # entries, a list with no dictionaries (i.e. "access": []) is
+            # stored as a plain property.
+            if spec_node.propval( "access" ) != [""] and spec_node["access"].pclass == "json":
                 access_list = spec_node["access"]
-                for access in access_list:
-                    _info( f"           access: ({type(access)} {access}" )
-                    access = self.access_target( access )
-                    try:
-                        access_type = access["type"]
-                    except:
-                        access_type = "device"
+            else:
+                access_list = []
 
-                    # _info( f"               type: {access_type}" )
+            for access in access_list:
+                _info( f"           access: ({type(access)} {access}" )
+                access = self.access_target( access )
+                if type(access) != dict:
+                    _debug( f"           access '{access}' is not an access entry, skipping" )
+                    continue
 
-                    if access_type == "device":
-                        try:
-                            dests = self.dests( access )
-                            # _info( f"                     devie dests: {dests}" )
-                            devices = self.devices( dests )
-                            # _info( f"                     devices: {devices}" )
-
-                            ## The device might be memory. We need to
-                            ## check if if has the "mem": "true" flag,
-                            ## or if it matches a regex.
-                            for dev in devices:
-                                try:
-                                    mem_flag = dev["mem"]
-                                except:
-                                    mem_flag = False
-
-                                if mem_flag:
-                                    # _info( f"                   device is memory: {dev}" )
-                                    domains_tree.memory_add( yaml_node, dev )
-                                    self.track_ref(spec_node.name, dev, "mem", False)
-                                else:
-                                    # add the devices to the node
-                                    flags = domains_tree.device_flags_map( dev, access )
-                                    domains_tree.device_add( yaml_node, dev, flags )
-
-                                    # TODO: track memory and cpus as well
-                                    #
-                                    # initialize ourself to False, any subdomains will toggle this
-                                    # to true if they do refernece it (the second call here)
-                                    self.track_ref(spec_node.name, dev, "dev", False)
-                                    if containing_subsystem:
-                                        try:
-                                            # this is the containing subsystem, track the reference
-                                            # there
-                                            self.track_ref(containing_subsystem.name,dev, "dev" )
-                                        except:
-                                            pass
-
-                            try:
-                                mem = yaml_node["memory"]
-                                if len(mem) == 1:
-                                    # force an empty entry if there's only one memory, since this
-                                    # ensures that the yaml will be in list form. If we don't
-                                    # do this, then assists down the pipeline have to deal with
-                                    # either lists or yaml nodes
-                                    mem.value.append( {} )
-                            except:
-                                pass
+                access_type = access.get( "type", "device" )
+
+                # _info( f"               type: {access_type}" )
+
+                if access_type == "device":
+                    try:
+                        dests = self.dests( access )
+                        # _info( f"                     devie dests: {dests}" )
+                        devices = self.devices( dests )
+                        # _info( f"                     devices: {devices}" )
+
+                        ## The device might be memory. We need to
+                        ## check if if has the "mem": "true" flag,
+                        ## or if it matches a regex.
+                        for dev in devices:
+                            if dev.get( "mem", False ):
+                                # _info( f"                   device is memory: {dev}" )
+                                domains_tree.memory_add( yaml_node, dev )
+                                self.track_ref(spec_node.name, dev, "mem", False)
+                            else:
+                                # add the devices to the node
+                                flags = domains_tree.device_flags_map( dev, access )
+                                domains_tree.device_add( yaml_node, dev, flags )
+
+                                # TODO: track memory and cpus as well
+                                #
+                                # initialize ourself to False, any subdomains will toggle this
+                                # to true if they do refernece it (the second call here)
+                                self.track_ref(spec_node.name, dev, "dev", False)
+                                if containing_subsystem:
+                                    try:
+                                        # this is the containing subsystem, track the reference
+                                        # there
+                                        self.track_ref(containing_subsystem.name,dev, "dev" )
+                                    except:
+                                        pass
 
-                        except:
-                            pass
-                    elif access_type == "cpu_list":
-                        _info( f"processing cpu list" )
                         try:
-                            dests = self.dests( access )
-                            # _info( f"                     cpus dests: {dests}" )
-                            cpus = self.cpus( dests )
-                            # _info( f"                     cpus: {cpus}" )
-
-                            for c in cpus:
-                                # add the cpus to the node
-                                domains_tree.cpu_add( yaml_node, c )
-                                self.track_ref(spec_node.name, c, "cpu", False)
-
-                            if len(cpus) == 1:
-                                # force an empty entry if there's only one cpu, since this
+                            mem = yaml_node["memory"]
+                            if len(mem) == 1:
+                                # force an empty entry if there's only one memory, since this
                                 # ensures that the yaml will be in list form. If we don't
                                 # do this, then assists down the pipeline have to deal with
                                 # either lists or yaml nodes
-                                cpu_list = yaml_node["cpus"]
-                                cpu_list.value.append( {} )
-
-                        except Exception as e:
-                            _info( f"exception procesing cpus: {e}" )
-
-                    elif access_type == "ss_management":
-                        _info( f"spec type ss_management: {access}" )
-                        _info( f"no action required, skipping" )
-                    elif access_type == "ss_permissions":
-                        _info( f"spec type ss_permissions: {access}" )
-                        _info( f"no action required, skipping" )
-                    else:
-                        _error( f"unknown spec type: {access_type}" )
+                                mem.value.append( {} )
+                        except:
+                            pass
 
-            except Exception as e:
-                # no access
-                # _info( f"no access found: {e}" )
-                pass
+                    except Exception as e:
+                        _info( f"exception processing devices: {e}" )
+                elif access_type == "cpu_list":
+                    _info( f"processing cpu list" )
+                    try:
+                        dests = self.dests( access )
+                        # _info( f"                     cpus dests: {dests}" )
+                        cpus = self.cpus( dests )
+                        # _info( f"                     cpus: {cpus}" )
+
+                        for c in cpus:
+                            # add the cpus to the node
+                            domains_tree.cpu_add( yaml_node, c )
+                            self.track_ref(spec_node.name, c, "cpu", False)
+
+                        if len(cpus) == 1:
+                            # force an empty entry if there's only one cpu, since this
+                            # ensures that the yaml will be in list form. If we don't
+                            # do this, then assists down the pipeline have to deal with
+                            # either lists or yaml nodes
+                            cpu_list = yaml_node["cpus"]
+                            cpu_list.value.append( {} )
+
+                    except Exception as e:
+                        _info( f"exception procesing cpus: {e}" )
+
+                elif access_type == "ss_management":
+                    _info( f"spec type ss_management: {access}" )
+                    _info( f"no action required, skipping" )
+                elif access_type == "ss_permissions":
+                    _info( f"spec type ss_permissions: {access}" )
+                    _info( f"no action required, skipping" )
+                else:
+                    _error( f"unknown spec type: {access_type}" )
 
         except Exception as e:
-            _info( f"isosdomain_convert: no domain '{domain_name}' found" )
+            _info( f"isosdomain_convert: error converting domain '{spec_node.name}': {e}" )
 
 ## kept for reference until SRAM is fixed
 # def isospec_process_memory( name, dest, sdt, json_tree, debug = False ):
@@ -1227,10 +1248,8 @@ def isospec_domain( tgt_node, sdt, options ):
     except FileNotFoundError as e:
         _error( f"ispec file {isospec} not found" )
 
-    # convert the spec to a LopperTree for consistent manipulation
-    json_in = LopperJSON( json=iso_file_abs )
-    json_tree = json_in.to_tree()
-
+    # the isospec object converts the spec to a LopperTree and builds
+    # the device/smid name indexes, so the spec is only parsed once
     spec = isospec( iso_file_abs )
 
     ## self test block